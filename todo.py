@@ -5,13 +5,27 @@ import json
 import csv
 import os
 import copy
+import heapq
 import sys
+import contextlib
+import asyncio
+import io
+import socket
+import signal
+import stat
+import traceback
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
 
 # Make it so list below is auto-generated from command dict.
 """
 disp [o]rder [lh | hl] - Sorts between high and low urgency.
 disp [g]roupCategories [y | n] - Enables or disables grouping by category.
 disp [n]umItems [num=10] - Sets the number of items to display.
+disp [f]ilter, [text] - Only displays tasks whose names contain every word of text. "disp filter," with no text shows all tasks again.
 - When category grouped, the categories with the highest total urgency show up first.
 
 set defaultTime [time='7d'] - Sets the default allotted time for a task.
@@ -33,6 +47,8 @@ a [taskname] [c]at]egory]=[itemname | itemid]=none [due]date]="defaultTime" [cri
 d [itemname | itemid] [reason] - Deletes an item and all subitems.
 c [itemname | itemid] [date=now] - Completes an item and all subitems.
 e [itemname | itemid] [name | due | crit] - Edits the name, due date, or criticality of an item.
+f[ind] [text] [cr]itical=[y | n] [ca]tegory=[itemname | itemid] [af]ter=[date] [be]fore=[date] - Lists the most urgent matching tasks, up to numItems.
+- To search for a word that is also an argument name, name the query: f q, be
 exp [] export history in various different formats to file
 
 """
@@ -49,6 +65,7 @@ class ToDo():
                     ("numItems", "num", "n"): [int, None],
                     ("gridwidth", "gw"): [int, None],
                     ("gridheight", "gh"): [int, None],
+                    ("filter", "f"): [str, None],
                     # None in args means that the argument is optional
                 },
                 "defargs": {
@@ -57,6 +74,7 @@ class ToDo():
                     "numItems": None,
                     "gridWidth": None,
                     "gridHeight": None,
+                    "filter": None,
                     # None in defargs means that no arg will be passed if none is specified
                 },
                 "help": "Sets the display appearance.",
@@ -183,6 +201,24 @@ class ToDo():
                 },
                 "help": "Edits the name, due date, or criticality of an item.",
             },
+            ("find", "filter", "f",): {
+                "func": self.findItems,
+                "args": {
+                    ("query", "q"): [str, None],
+                    ("critical", "cr"): [str, None],
+                    ("category", "ca"): [str, None],
+                    ("after", "af"): [str, None],
+                    ("before", "be"): [str, None],
+                },
+                "defargs": {
+                    "query": None,
+                    "critical": None,
+                    "category": None,
+                    "after": None,
+                    "before": None,
+                },
+                "help": "Lists tasks matching a name search, criticality, category, and due date range, ranked by urgency.",
+            },
             ("export", "exp",): {
                 "func": self.exportHistory,
                 "args": {
@@ -211,11 +247,31 @@ class ToDo():
         "itemCriticalMultiplier": 1.0,
         "startupCommands": [],
         "logHistory": False,
-        "categoryPersistence": False
+        "categoryPersistence": False,
+        "displayFilter": None,
         }
         for k, v in self.settings.items():
             setattr(self, k, v)
 
+        # State of the tasks file as of our last load/save, used to detect and merge writes from other sessions.
+        self.fileStamp = None # (mtime_ns, size) of the tasks file
+        self.generation = 0 # Incremented on every save, stored in the file
+        self.itemGenerations = {} # id -> generation of the save that last changed it
+        self.deletedItems = {} # id -> generation of the save that deleted it
+        self.dirtyItems = {} # id -> task as it was on disk before our unsaved changes (None if added locally)
+        self.syncedSettings = {}
+        self.notices = []
+
+        self.interactive = True # False when running as a server, where the screen isn't ours to clear
+        self.saveDelay = 1.0 # Seconds the server waits to batch writes from several commands into one save
+        self.saveHandle = None
+
+        # Inverted index over task names (word prefixes and trigrams), plus criticality and category, kept in step with taskDict.
+        self.nameIndex = {} # gram -> set of ids
+        self.parentIndex = {} # parent id -> set of child ids
+        self.criticalIds = set()
+        self.indexedItems = {} # id -> (lowercase name, parent, critical) as last indexed
+
     def getInput(self):
         command = input("> ")
         args = command.split(" ")
@@ -228,9 +284,13 @@ class ToDo():
             
     def executeInput(self):
         args = self.getInput()
+        return self.executeCommand(args)
+
+    def executeCommand(self, args):
         args = [a.lower() for a in args]
         if len(args) == 0:
             return
+        self.syncWithDisk() # Pick up changes made by other sessions before acting on possibly stale tasks
         
         cdict = self.commandDict
         for i, arg in enumerate(args):
@@ -239,7 +299,7 @@ class ToDo():
                 status = self.executeFunction(cdict, " ".join(args[i+1:]).split(","))
                 if status:
                     self.refresh_screen()
-                return
+                return status
             elif cdict is None:
                 print("Invalid command.")
                 return
@@ -265,7 +325,7 @@ class ToDo():
             # print(f'kwarg {kwarg} arg {arg}') # debug
             if arg == "help":
                 print(help)
-                return
+                return False
             if kwarg and kwmode:
                 if arg in argopts:
                     try:
@@ -297,6 +357,9 @@ class ToDo():
                     finalArgs[list(defargs.keys())[i]] = arg
                     i += 1
         # print(finalArgs) # debug
+        if kwarg is not None: # Keyword given as the last argument, without a value
+            print(f'Missing value for {kwarg}.')
+            return
 
         for i, arg in enumerate(defargs.keys()):
             if None not in list(args.values())[i]:
@@ -337,18 +400,25 @@ class ToDo():
                 line += info[i].center(w) + "|"
         return line
 
-    def printGrid(self):
-        # below line sorts dict by urgency
-        rev = True if self.displayOrder == "lh" else False
-        self.taskDict = dict(sorted(self.taskDict.items(), key=lambda item: self.calculateUrgency(item[0]), reverse=rev))
-        names = [self.taskDict[i]["name"] for i in self.taskDict.keys()]
-        dues_float = [self.taskDict[i]["due"] for i in self.taskDict.keys()]
+    def printGrid(self, itemids=None):
+        if itemids is None and self.displayFilter:
+            itemids = self.matchItems(self.displayFilter, None, None, None, None)
+            if itemids is not None:
+                itemids = self.rankItems(itemids)
+                print(f'Filtered by: {self.displayFilter} (disp filter, to clear)')
+        if itemids is None:
+            # below line sorts dict by urgency
+            rev = True if self.displayOrder == "lh" else False
+            self.taskDict = dict(sorted(self.taskDict.items(), key=lambda item: self.calculateUrgency(item[0]), reverse=rev))
+            itemids = list(self.taskDict.keys())
+        names = [self.taskDict[i]["name"] for i in itemids]
+        dues_float = [self.taskDict[i]["due"] for i in itemids]
         dues = [datetime.datetime.utcfromtimestamp(d).strftime("%b %d") for d in dues_float]
-        assigneds = [datetime.datetime.utcfromtimestamp(self.taskDict[i]["assigned"]).strftime("%b %d, %Y") for i in self.taskDict.keys()]
-        criticals = ["Y" if self.taskDict[i]["critical"] else "N" for i in self.taskDict.keys()]
-        urgencies = [f'{self.calculateUrgency(i):02.0f}' for i in self.taskDict.keys()]
+        assigneds = [datetime.datetime.utcfromtimestamp(self.taskDict[i]["assigned"]).strftime("%b %d, %Y") for i in itemids]
+        criticals = ["Y" if self.taskDict[i]["critical"] else "N" for i in itemids]
+        urgencies = [f'{self.calculateUrgency(i):02.0f}' for i in itemids]
         remainings = [d - time.time() for d in dues_float]
-        ids = [str(i) for i in self.taskDict.keys()]
+        ids = [str(i) for i in itemids]
         hour = 60*60
         day = 24*hour
         week = 7*day
@@ -363,7 +433,7 @@ class ToDo():
         columns = [names, ids, remainings, criticals, urgencies]
         # print(columns) # debug
         padding = 2 
-        if len(self.taskDict) > 0:
+        if len(itemids) > 0:
             widths = [max(len(sorted(c, key=lambda z: len(z))[-1]), len(headers[i]))+padding for i, c in enumerate(columns)]
         else:
             widths = [len(h)+padding for h in headers]
@@ -374,7 +444,7 @@ class ToDo():
         print(self.generateLine(widths))
 
         item = 0
-        while item <= (len(self.taskDict) - 1):
+        while item <= (len(itemids) - 1):
             try:
                 info = [c[item] for c in columns]
             except IndexError:
@@ -384,29 +454,183 @@ class ToDo():
         print(self.generateLine(widths))
         sys.stdout.flush()
     
+    @contextlib.contextmanager
+    def lockTasksFile(self):
+        # Advisory lock on a sidecar file, so the tasks file itself can be replaced atomically while held.
+        with open(self.tasks_settings_filepath + ".lock", 'a+') as lockfile:
+            if fcntl is not None:
+                fcntl.flock(lockfile, fcntl.LOCK_EX)
+            else:
+                lockfile.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(lockfile.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError: # LK_LOCK gives up after ~10 seconds, keep waiting
+                        continue
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lockfile, fcntl.LOCK_UN)
+                else:
+                    lockfile.seek(0)
+                    msvcrt.locking(lockfile.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def getFileStamp(self):
+        try:
+            st = os.stat(self.tasks_settings_filepath)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def markSynced(self):
+        self.dirtyItems = {}
+        self.syncedSettings = copy.deepcopy({k: getattr(self, k) for k in self.settings.keys()})
+
+    def markDirty(self, id):
+        # Call before changing an item, so the merge knows our change and what it was based on.
+        if id not in self.dirtyItems:
+            self.dirtyItems[id] = copy.deepcopy(self.taskDict.get(id))
+
+    def hasUnsavedChanges(self):
+        settings = {k: getattr(self, k) for k in self.settings.keys()}
+        return bool(self.dirtyItems) or settings != self.syncedSettings
+
+    def nextItemId(self, *idDicts):
+        return max(max(d.keys(), default=-1) for d in (self.taskDict,) + idDicts) + 1
+
+    def syncWithDisk(self):
+        # Cheap check first: only re-read the file if another process has written to it since our last load/save.
+        if self.getFileStamp() == self.fileStamp:
+            return
+        with self.lockTasksFile():
+            self.mergeFromDisk()
+
+    def mergeFromDisk(self):
+        # Caller must hold the file lock. Takes records that another session saved since our last sync,
+        # keeps records that only we changed, and reports records that both changed (their version wins).
+        try:
+            with open(self.tasks_settings_filepath, 'r') as jsonfile:
+                tasks_and_settings = json.load(jsonfile)
+        except FileNotFoundError:
+            return # Next save recreates it
+        self.fileStamp = self.getFileStamp()
+        generation = tasks_and_settings.get("generation", 0)
+        if generation == self.generation:
+            return
+        diskTasks = tasks_and_settings["tasks"] # Keys are still strings, only changed records are looked up
+        diskSettings = tasks_and_settings["settings"]
+        if "itemGenerations" in tasks_and_settings:
+            diskGenerations = {int(k): g for k, g in tasks_and_settings["itemGenerations"].items()}
+            diskDeleted = {int(k): g for k, g in tasks_and_settings["deletedItems"].items()}
+            changed = [id for id, g in diskGenerations.items() if g > self.generation]
+            changed += [id for id, g in diskDeleted.items() if g > self.generation]
+        else: # Written without per-item generations, so every record has to be compared
+            diskGenerations = {int(k): generation for k in diskTasks.keys()}
+            diskDeleted = {}
+            changed = set(self.taskDict) | set(diskGenerations)
+
+        for id in changed:
+            localTask, diskTask = self.taskDict.get(id), diskTasks.get(str(id))
+            if id in self.dirtyItems:
+                baseTask = self.dirtyItems.pop(id)
+                if localTask == diskTask:
+                    continue
+                if baseTask == diskTask: # Only we changed it
+                    self.dirtyItems[id] = baseTask
+                    continue
+                if baseTask is None and localTask is not None and diskTask is not None: # Both sessions added a task under the same ID, so move ours
+                    newid = self.nextItemId(diskGenerations, diskDeleted, self.dirtyItems)
+                    self.taskDict[newid] = localTask
+                    self.dirtyItems[newid] = None
+                    for childid, task in self.taskDict.items():
+                        if task["parent"] == id and task is not localTask:
+                            self.markDirty(childid)
+                            task["parent"] = newid
+                            self.reindexItem(childid)
+                    self.reindexItem(newid)
+                else:
+                    name = (localTask or diskTask or baseTask)["name"]
+                    self.notices.append(f'Conflict on task "{name}" (ID {id}): changed by another session, keeping their version.')
+            elif localTask == diskTask:
+                continue
+            if diskTask is None:
+                self.taskDict.pop(id, None)
+            else:
+                self.taskDict[id] = diskTask
+            self.reindexItem(id)
+
+        for k, diskValue in diskSettings.items():
+            baseValue = self.syncedSettings.get(k)
+            if baseValue == diskValue:
+                continue
+            localValue = getattr(self, k, None)
+            if localValue != baseValue and localValue != diskValue:
+                self.notices.append(f'Conflict on setting "{k}": changed by another session, keeping their version.')
+            setattr(self, k, diskValue)
+
+        self.generation = generation
+        self.itemGenerations, self.deletedItems = diskGenerations, diskDeleted
+        self.syncedSettings = copy.deepcopy(diskSettings)
+
     def saveTasksAndSettings(self):
         filename = self.tasks_settings_filepath
-        tasks_and_settings = {
-            "tasks": self.taskDict,
-            "settings": {k: getattr(self, k) for k in self.settings.keys()},
-        }
-
-        with open(filename, 'w') as jsonfile:
-            json.dump(tasks_and_settings, jsonfile)
+        if self.fileStamp is not None and not self.hasUnsavedChanges():
+            return # Nothing changed locally, so don't overwrite other sessions' writes
+        with self.lockTasksFile():
+            if self.getFileStamp() != self.fileStamp:
+                self.mergeFromDisk()
+                if self.fileStamp is not None and not self.hasUnsavedChanges():
+                    return
+            generation = self.generation + 1
+            for id in self.dirtyItems.keys():
+                if id in self.taskDict:
+                    self.itemGenerations[id] = generation
+                    self.deletedItems.pop(id, None)
+                else:
+                    self.itemGenerations.pop(id, None)
+                    self.deletedItems[id] = generation
+            tasks_and_settings = {
+                "generation": generation,
+                "itemGenerations": self.itemGenerations, # Lets other sessions merge only the records saved since their last sync
+                "deletedItems": self.deletedItems,
+                "tasks": self.taskDict,
+                "settings": {k: getattr(self, k) for k in self.settings.keys()},
+            }
+            with open(filename + ".tmp", 'w') as jsonfile:
+                json.dump(tasks_and_settings, jsonfile)
+            os.replace(filename + ".tmp", filename) # Readers never see a half-written file
+            self.generation = generation
+            self.fileStamp = self.getFileStamp()
+        self.markSynced()
 
     def loadTasksAndSettings(self):
         filename = self.tasks_settings_filepath
         try:
-            with open(filename, 'r') as jsonfile:
-                tasks_and_settings = json.load(jsonfile)
+            with self.lockTasksFile():
+                with open(filename, 'r') as jsonfile:
+                    tasks_and_settings = json.load(jsonfile)
+                self.fileStamp = self.getFileStamp()
             self.taskDict = tasks_and_settings["tasks"]
             self.taskDict = {int(k): v for k, v in self.taskDict.items()}
-            self.settings = tasks_and_settings["settings"]
+            self.settings = {**self.settings, **tasks_and_settings["settings"]} # Settings added since the file was written keep their defaults
+            self.generation = tasks_and_settings.get("generation", 0)
+            itemGenerations = {int(k): g for k, g in tasks_and_settings.get("itemGenerations", {}).items()}
+            self.itemGenerations = {id: itemGenerations.get(id, 0) for id in self.taskDict.keys()}
+            self.deletedItems = {int(k): g for k, g in tasks_and_settings.get("deletedItems", {}).items()}
         except FileNotFoundError:
             print("No tasks and settings file found. Creating new one.")
             self.saveTasksAndSettings()
         for k, v in self.settings.items():
                 setattr(self, k, v)
+        self.markSynced()
+        self.rebuildIndex()
+
+    def printNotices(self):
+        for notice in self.notices:
+            print(notice)
+        self.notices = []
 
     def findItem(self, item):
         try:
@@ -417,10 +641,112 @@ class ToDo():
             except KeyError:
                 return None
         except ValueError:
-            for id, task in self.taskDict.items():
-                if task["name"].lower() == item:
-                    return id
-            return None
+            candidates = self.searchNames(item) if re.search(r"\w", item) else self.taskDict.keys()
+            matches = [id for id in candidates if self.taskDict[id]["name"].lower() == item]
+            return min(matches) if matches else None
+
+    def nameGrams(self, name):
+        # Word prefixes of 1-2 characters (marked with ^) serve short queries, trigrams serve everything longer.
+        grams = set()
+        for token in re.findall(r"\w+", name.lower()):
+            grams.update("^" + token[:n] for n in (1, 2) if len(token) >= n)
+            grams.update(token[i:i+3] for i in range(len(token) - 2))
+        return grams
+
+    def reindexItem(self, id):
+        # Call after adding, renaming, recategorizing, or deleting an item.
+        old = self.indexedItems.pop(id, None)
+        if old is not None:
+            name, parent, critical = old
+            for gram in self.nameGrams(name):
+                self.nameIndex[gram].discard(id)
+                if not self.nameIndex[gram]:
+                    del self.nameIndex[gram]
+            self.parentIndex[parent].discard(id)
+            if not self.parentIndex[parent]:
+                del self.parentIndex[parent]
+            self.criticalIds.discard(id)
+        task = self.taskDict.get(id)
+        if task is not None:
+            name, parent, critical = task["name"].lower(), task["parent"], task["critical"]
+            for gram in self.nameGrams(name):
+                self.nameIndex.setdefault(gram, set()).add(id)
+            self.parentIndex.setdefault(parent, set()).add(id)
+            if critical:
+                self.criticalIds.add(id)
+            self.indexedItems[id] = (name, parent, critical)
+
+    def rebuildIndex(self):
+        self.nameIndex, self.parentIndex, self.criticalIds, self.indexedItems = {}, {}, set(), {}
+        for id in self.taskDict.keys():
+            self.reindexItem(id)
+
+    def searchNames(self, query):
+        # Returns the ids whose name contains every word of the query (words of 1-2 characters match word starts).
+        # A query without any words matches nothing.
+        ids = None
+        for token in re.findall(r"\w+", query.lower()):
+            if len(token) < 3:
+                matches = self.nameIndex.get("^" + token, set())
+            else:
+                grams = sorted((self.nameIndex.get(token[i:i+3], set()) for i in range(len(token) - 2)), key=len)
+                matches = {id for id in grams[0].intersection(*grams[1:]) if token in self.indexedItems[id][0]}
+            ids = set(matches) if ids is None else ids & matches
+            if not ids:
+                return set()
+        return set() if ids is None else ids
+
+    def matchItems(self, query, critical, category, after, before):
+        # Returns matching ids in no particular order, or None if an argument is invalid. Starts from the smallest indexed set.
+        candidates = []
+        if query is not None:
+            if not re.search(r"\w", query):
+                print("Invalid search: must contain letters or numbers.")
+                return
+            candidates.append(self.searchNames(query))
+        if critical is not None:
+            if critical not in ("y", "n"):
+                print("Invalid criticality value: must be y or n.")
+                return
+            if critical == "y":
+                candidates.append(self.criticalIds)
+        if category is not None:
+            catid = self.findItemWrapper(category)
+            if catid is None:
+                return
+            candidates.append(self.parentIndex.get(catid, set()))
+        dues = []
+        for date in (after, before):
+            if date is not None:
+                date = self.parseDate(date)
+                if date is None:
+                    print("Invalid date format, refer to help command.")
+                    return
+            dues.append(date)
+        after, before = dues
+
+        ids = min(candidates, key=len) if candidates else self.taskDict.keys()
+        matches = []
+        for id in ids:
+            task = self.taskDict[id]
+            if query is not None and id not in candidates[0]:
+                continue
+            if critical is not None and task["critical"] != (critical == "y"):
+                continue
+            if category is not None and task["parent"] != catid:
+                continue
+            if (after is not None and task["due"] < after) or (before is not None and task["due"] > before):
+                continue
+            matches.append(id)
+        return matches
+
+    def rankItems(self, ids, num=None):
+        # Sorts by urgency in displayOrder. With num, keeps the num most urgent regardless of displayOrder.
+        if num is None:
+            ranked = sorted(ids, key=self.calculateUrgency, reverse=True)
+        else:
+            ranked = heapq.nlargest(num, ids, key=self.calculateUrgency)
+        return ranked if self.displayOrder == "lh" else ranked[::-1]
 
     def parseDate(self, input_string):
         input_string = input_string.strip() # leading/trailing spaces cause issues
@@ -514,12 +840,17 @@ class ToDo():
             return False
 
     def clear_screen(self):
+        if not self.interactive:
+            return
         if os.name == 'nt':  # for Windows
             _ = os.system('cls')
         else:  # for macOS and Linux
             _ = os.system('clear')
 
     def refresh_screen(self):
+        if not self.interactive: # Redrawing the whole list would cost more than the command itself
+            print("Done.")
+            return
         self.clear_screen()
         self.printGrid()
 
@@ -530,9 +861,70 @@ class ToDo():
             return None
         return item
 
+    async def serve(self, socket_path):
+        # Keeps this instance resident and runs commands from todoclient.py, one at a time on this event loop.
+        if os.path.lexists(socket_path):
+            if not stat.S_ISSOCK(os.lstat(socket_path).st_mode):
+                print(f'{socket_path} exists and is not a socket, refusing to replace it.')
+                return
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(socket_path)
+                print(f'A server is already running on {socket_path}.')
+                return
+            except ConnectionRefusedError: # Left behind by a server that didn't shut down cleanly
+                os.unlink(socket_path)
+            finally:
+                probe.close()
+        server = await asyncio.start_unix_server(self.handleClient, path=socket_path)
+        print(f'Serving on {socket_path}')
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGHUP):
+            loop.add_signal_handler(sig, server.close)
+        try:
+            async with server:
+                await server.serve_forever()
+        except asyncio.CancelledError: # server.close() from a signal handler, or Ctrl+C
+            pass
+        finally:
+            if self.saveHandle is not None:
+                self.saveHandle.cancel()
+            self.saveTasksAndSettings()
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+    async def handleClient(self, reader, writer):
+        try:
+            command = (await reader.readline()).decode()
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                try:
+                    status = self.executeCommand([a for a in command.strip().split(" ") if a != ""])
+                except Exception as e:
+                    traceback.print_exc() # To the server's stderr
+                    print(f'Error: {type(e).__name__}: {e}')
+                    status = None
+                self.printNotices()
+            if status:
+                self.scheduleSave()
+            # First line of the reply is the exit status for todoclient.py
+            writer.write(("1" if status is None else "0").encode() + b"\n" + output.getvalue().encode())
+            await writer.drain()
+        finally:
+            writer.close()
+
+    def scheduleSave(self):
+        if self.saveHandle is None:
+            self.saveHandle = asyncio.get_running_loop().call_later(self.saveDelay, self.flushSave)
+
+    def flushSave(self):
+        self.saveHandle = None
+        self.saveTasksAndSettings()
+
 ### Below: User-accessible commands that might print stuff. Should return True if they are successful.
+### Commands that succeed without changing anything return False, so the screen isn't redrawn. None means failure.
 
-    def setDisplay(self, order, category, numItems, gridWidth, gridHeight):
+    def setDisplay(self, order, category, numItems, gridWidth, gridHeight, filter):
         if order is not None:
             self.displayOrder = order
         if category is not None:
@@ -543,6 +935,14 @@ class ToDo():
             self.displayGridWidth = gridWidth
         if gridHeight is not None:
             self.displayGridHeight = gridHeight
+        if filter is not None:
+            if filter == "":
+                self.displayFilter = None
+            elif not re.search(r"\w", filter):
+                print("Invalid filter: must contain letters or numbers.")
+                return
+            else:
+                self.displayFilter = filter
         return True
         
     def setDefaultTime(self, time):
@@ -623,7 +1023,9 @@ class ToDo():
             return
         except:
             pass
-        self.taskDict[len(self.taskDict)] = {
+        id = self.nextItemId(self.dirtyItems) # Don't reuse the ID of an unsaved deletion
+        self.markDirty(id)
+        self.taskDict[id] = {
             "name": name,
             "due": due,
             "assigned": time.time(),
@@ -631,6 +1033,7 @@ class ToDo():
             "isTask": True,
             "parent": catid,
         }
+        self.reindexItem(id)
         return True
 
     def deleteItem(self, item, reason, date=time.time()):
@@ -641,7 +1044,9 @@ class ToDo():
         if not status:
             print("Unable to write to history file because it is open in another program. Please close the file and try again.")
         else:
+            self.markDirty(id)
             del self.taskDict[id]
+            self.reindexItem(id)
             return True
 
 
@@ -668,23 +1073,40 @@ class ToDo():
                 print("Invalid name: must be a string with non-numeric characters.")
                 return
             except ValueError:
+                self.markDirty(id)
                 self.taskDict[id]["name"] = value
+                self.reindexItem(id)
                 return True
         elif attribute == "due" or attribute == "du":
             date = self.parseDate(value)
             if date is None:
                 print("Invalid date format, refer to help command.")
                 return
+            self.markDirty(id)
             self.taskDict[id]["due"] = date
             return True
         elif attribute == "crit" or attribute == "cr":
             if value == "y" or value == "n":
+                self.markDirty(id)
                 self.taskDict[id]["critical"] = True if value == "y" else False
+                self.reindexItem(id)
                 return True
             else:
                 print("Invalid criticality value: must be y or n.")
                 return
         
+    def findItems(self, query, critical, category, after, before):
+        ids = self.matchItems(query, critical, category, after, before)
+        if ids is None:
+            return
+        if not ids:
+            print("No matching tasks.")
+            return False
+        self.printGrid(self.rankItems(ids, self.displayMaxNumItems))
+        if len(ids) > self.displayMaxNumItems:
+            print(f'Showing {self.displayMaxNumItems} of {len(ids)} matches.')
+        return False # Not True, the refresh would replace the results with the full list
+
     def exportHistory(self, type, format, file):
         if type == "current" and format == "csv":
             self.create_csv_from_tasks(self.taskDict, file + ".csv")
@@ -701,13 +1123,22 @@ if mode == "me":
 elif mode == "dev":
     td = ToDo(tasks_settings_filepath=r"example_config.json",
             completion_history_filepath=r"CmdTodoHistory.csv")
-    
+socket_filepath = os.environ.get("CMDTODO_SOCKET", os.path.expanduser("~/.cmdtodo.sock")) # Must match todoclient.py
+
 td.loadTasksAndSettings()
+if sys.argv[1:] == ["serve"]:
+    td.interactive = False
+    try:
+        asyncio.run(td.serve(socket_filepath))
+    except KeyboardInterrupt:
+        pass
+    sys.exit()
 td.refresh_screen()
 while True:
     # print(td.taskDict) # debug
     td.executeInput()
     td.saveTasksAndSettings()
+    td.printNotices()
 
 
 
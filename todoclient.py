@@ -0,0 +1,28 @@
+import os
+import socket
+import sys
+
+# Thin client for a server started with "python todo.py serve". Usage: python todoclient.py a buy milk, 3d
+socket_filepath = os.environ.get("CMDTODO_SOCKET", os.path.expanduser("~/.cmdtodo.sock")) # Must match todo.py
+
+if len(sys.argv) < 2:
+    print("Usage: python todoclient.py [command]")
+    sys.exit(1)
+
+client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+try:
+    client.connect(socket_filepath)
+except (FileNotFoundError, ConnectionRefusedError):
+    print(f'No server running on {socket_filepath}. Start one with "python todo.py serve".')
+    sys.exit(1)
+client.sendall((" ".join(sys.argv[1:]) + "\n").encode())
+response = b""
+while True:
+    chunk = client.recv(65536)
+    if not chunk:
+        break
+    response += chunk
+client.close()
+status, _, output = response.decode().partition("\n") # Server replies with its exit status on the first line
+sys.stdout.write(output)
+sys.exit(int(status) if status.isdigit() else 1)